@@ -11,55 +11,79 @@ This script:
 This helps identify high-impact vtable entries and callbacks to patch out.
 """
 
+import functools
+import gzip
+import hashlib
+import mmap
+import multiprocessing
+import os
+import pickle
 import re
 import subprocess
 import sys
 from pathlib import Path
-from collections import defaultdict, deque
-from typing import Dict, Set, List, Tuple
+from collections import defaultdict
+from typing import Any, Callable, Dict, FrozenSet, Iterator, Optional, Set, List, Tuple
+
+# Function pointer reference in C source: &function_name
+FUNC_REF_RE = re.compile(rb'&([a-zA-Z_][a-zA-Z0-9_]+)')
 
 def find_function_pointers(git_dir: Path) -> Dict[str, List[Tuple[str, int]]]:
     """
     Find all function pointer references (&func) in C source files.
 
+    Each .c/.h file is memory-mapped and scanned with a single regex pass.
+
     Returns: dict mapping function_name -> [(file, line_number), ...]
     """
     function_refs = defaultdict(list)
 
-    # Search for &function_name patterns in C files
-    result = subprocess.run(
-        ['grep', '-rn', '-E', r'&[a-zA-Z_][a-zA-Z0-9_]+', '--include=*.c', '--include=*.h', str(git_dir)],
-        capture_output=True, text=True, check=False
-    )
+    for dir_path, dir_names, file_names in os.walk(git_dir):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            if not file_name.endswith(('.c', '.h')):
+                continue
+            file_path = Path(dir_path) / file_name
+            if file_path.is_symlink():
+                continue
 
-    for line in result.stdout.split('\n'):
-        if not line:
-            continue
-
-        # Parse grep output: file:line:content
-        parts = line.split(':', 2)
-        if len(parts) < 3:
-            continue
+            try:
+                with open(file_path, 'rb') as f, \
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    rel_path = str(file_path.relative_to(git_dir))
+                    line_num = 1
+                    line_start = 0
+                    for match in FUNC_REF_RE.finditer(mm):
+                        # Count lines incrementally up to this match
+                        line_num += mm[line_start:match.start()].count(b'\n')
+                        line_start = match.start()
+
+                        func_name = match.group(1).decode('ascii')
+                        # Filter out likely non-function references
+                        if not func_name.isupper():  # Skip ALL_CAPS (likely constants)
+                            function_refs[func_name].append((rel_path, line_num))
+            except ValueError:
+                # Empty files cannot be mapped
+                continue
 
-        file_path, line_num, content = parts
+    return function_refs
 
-        # Extract function names from &func references
-        for match in re.finditer(r'&([a-zA-Z_][a-zA-Z0-9_]+)', content):
-            func_name = match.group(1)
-            # Filter out likely non-function references
-            if not func_name.isupper():  # Skip ALL_CAPS (likely constants)
-                rel_path = Path(file_path).relative_to(git_dir)
-                function_refs[func_name].append((str(rel_path), int(line_num)))
+def stream_lines(cmd: List[str]) -> Iterator[str]:
+    """
+    Run a command and yield its output line by line while it runs.
 
-    return function_refs
+    The output is parsed as it arrives instead of being buffered whole.
+    Raises CalledProcessError if the command fails.
+    """
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True) as proc:
+        yield from proc.stdout
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
 
 def get_all_symbols(binary: Path) -> Dict[str, int]:
     """Extract all text symbols and their sizes from binary."""
-    result = subprocess.run(['nm', '-S', '--defined-only', binary],
-                          capture_output=True, text=True, check=True)
-
     symbols = {}
-    for line in result.stdout.strip().split('\n'):
+    for line in stream_lines(['nm', '-S', '--defined-only', str(binary)]):
         parts = line.split()
         # nm -S format: address [size] type name
         # With size: address size type name (4 parts)
@@ -79,57 +103,209 @@ def get_all_symbols(binary: Path) -> Dict[str, int]:
 
     return symbols
 
-def get_calls_from_function(func_name: str, binary: Path, symbols: Set[str]) -> Set[str]:
-    """Extract function calls from a specific function using objdump."""
-    try:
-        result = subprocess.run(
-            ['objdump', '-d', f'--disassemble={func_name}', binary],
-            capture_output=True, text=True, check=True, timeout=5
-        )
-
-        calls = set()
-        for line in result.stdout.split('\n'):
-            match = re.search(r'callq?\s+[0-9a-f]+\s+<([^@>]+)', line)
-            if match:
-                called = match.group(1)
-                if called in symbols and called != func_name:
-                    calls.add(called)
-        return calls
-    except:
-        return set()
-
-def build_call_graph(binary: Path, symbols: Set[str]) -> Dict[str, Set[str]]:
-    """Build call graph: function -> set of functions it calls."""
-    print("Building call graph (this may take a minute)...", file=sys.stderr)
-    call_graph = {}
+# objdump -d output: "0000000000001139 <leaf>:" starts a function,
+# "call   1139 <leaf>" inside it is a call (PLT stubs like <printf@plt> are skipped)
+FUNCTION_START_RE = re.compile(r'^[0-9a-f]+ <([^>]+)>:')
+CALL_RE = re.compile(r'callq?\s+[0-9a-f]+\s+<([^@>]+)')
+
+def get_function_starts(binary: Path, symbols: Set[str]) -> List[int]:
+    """Sorted start addresses of the given text symbols."""
+    starts = set()
+    for line in stream_lines(['nm', '--defined-only', str(binary)]):
+        parts = line.split()
+        if len(parts) == 3 and parts[1] in ['T', 't'] and parts[2] in symbols:
+            starts.add(int(parts[0], 16))
+    return sorted(starts)
+
+def disassemble_calls(address_range: Tuple[Optional[int], Optional[int]], binary: str,
+                      symbols: FrozenSet[str]) -> Dict[str, Set[str]]:
+    """
+    Disassemble one address range of the binary with objdump.
 
-    for i, func in enumerate(symbols):
-        if i % 100 == 0:
-            print(f"  Progress: {i}/{len(symbols)} functions analyzed", file=sys.stderr)
-        call_graph[func] = get_calls_from_function(func, binary, symbols)
+    Returns: dict mapping function_name -> set of functions it calls, for the
+    functions starting inside the range.
+    """
+    start, stop = address_range
+    cmd = ['objdump', '-d', '--no-show-raw-insn']
+    if start is not None:
+        cmd.append(f'--start-address={start:#x}')
+    if stop is not None:
+        cmd.append(f'--stop-address={stop:#x}')
+    cmd.append(binary)
+
+    calls = {}
+    current = None
+    for line in stream_lines(cmd):
+        match = FUNCTION_START_RE.match(line)
+        if match:
+            current = match.group(1) if match.group(1) in symbols else None
+            continue
+        if current is None:
+            continue
+        match = CALL_RE.search(line)
+        if match:
+            called = match.group(1)
+            if called in symbols and called != current:
+                calls.setdefault(current, set()).add(called)
+    return calls
+
+def build_call_graph(binary: Path, symbols: Set[str], jobs: Optional[int] = None) -> Dict[str, Set[str]]:
+    """
+    Build call graph: function -> set of functions it calls.
+
+    Disassembling is CPU bound, so the binary is split at function boundaries
+    into one address range per CPU and the ranges are disassembled by parallel
+    objdump processes. Each output is split at the function labels.
+    """
+    print("Building call graph (this may take a minute)...", file=sys.stderr)
+    call_graph = {func: set() for func in symbols}
+
+    # Split points at function starts, so no function spans two ranges
+    jobs = jobs or os.cpu_count() or 1
+    starts = get_function_starts(binary, symbols)
+    step = max(1, -(-len(starts) // jobs))
+    boundaries = [None] + starts[step::step] + [None]
+    address_ranges = list(zip(boundaries, boundaries[1:]))
+
+    worker = functools.partial(disassemble_calls, binary=str(binary), symbols=frozenset(symbols))
+    with multiprocessing.Pool(len(address_ranges)) as pool:
+        for done, calls in enumerate(pool.imap_unordered(worker, address_ranges), 1):
+            for func, called in calls.items():
+                call_graph[func] |= called
+            print(f"  Progress: {done}/{len(address_ranges)} address ranges disassembled", file=sys.stderr)
 
     print(f"  Complete: {len(symbols)} functions analyzed", file=sys.stderr)
     return call_graph
 
-def calculate_reachable_from(func: str, call_graph: Dict[str, Set[str]]) -> Set[str]:
+def get_cache_dir() -> Path:
+    """Directory for cached analysis results ($XDG_CACHE_HOME/git-prompt)."""
+    return Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'git-prompt'
+
+def load_or_build(binary: Path, kind: str, builder: Callable[[], Any]) -> Any:
+    """
+    Return the cached result of builder() for this binary, building it on a miss.
+
+    Results are cached per binary path and invalidated when the binary's
+    mtime or size changes. Cache problems are never fatal, the result is
+    just rebuilt.
     """
-    Calculate all functions reachable from a given root function.
-    Uses BFS traversal.
+    stat = binary.stat()
+    path_hash = hashlib.sha1(str(binary.resolve()).encode()).hexdigest()
+    prefix = f'vtable-{kind}-{path_hash}-'
+    cache_dir = get_cache_dir()
+    cache_file = cache_dir / f'{prefix}{stat.st_mtime_ns}-{stat.st_size}.pkl.gz'
+
+    try:
+        with gzip.open(cache_file, 'rb') as f:
+            result = pickle.load(f)
+        print(f"   Using cached {kind} from {cache_file}", file=sys.stderr)
+        return result
+    except FileNotFoundError:
+        pass
+    except (OSError, EOFError, pickle.UnpicklingError) as e:
+        print(f"   Ignoring unreadable cache {cache_file}: {e}", file=sys.stderr)
+
+    result = builder()
+
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Drop results for older builds of the same binary
+        for stale in cache_dir.glob(f'{prefix}*.pkl.gz'):
+            stale.unlink(missing_ok=True)
+        tmp_file = cache_file.with_name(f'{cache_file.name}.{os.getpid()}.tmp')
+        with gzip.open(tmp_file, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"   Could not write cache {cache_file}: {e}", file=sys.stderr)
+
+    return result
+
+def find_sccs(call_graph: Dict[str, Set[str]]) -> List[List[str]]:
     """
-    reachable = set()
-    queue = deque([func])
+    Find the strongly connected components of the call graph (Tarjan's algorithm).
 
-    while queue:
-        current = queue.popleft()
-        if current in reachable:
+    Iterative, so deep call chains cannot hit the recursion limit. Components
+    are returned callees first: every component comes after all components
+    reachable from it.
+    """
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    sccs = []
+
+    for root in call_graph:
+        if root in index:
             continue
-        reachable.add(current)
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(call_graph[root]))]
+
+        while work:
+            func, callees = work[-1]
+            for called in callees:
+                if called not in index:
+                    # Descend into the callee, resume this iterator afterwards
+                    index[called] = lowlink[called] = len(index)
+                    stack.append(called)
+                    on_stack.add(called)
+                    work.append((called, iter(call_graph.get(called, ()))))
+                    break
+                if called in on_stack:
+                    lowlink[func] = min(lowlink[func], index[called])
+            else:
+                work.pop()
+                if work:
+                    caller = work[-1][0]
+                    lowlink[caller] = min(lowlink[caller], lowlink[func])
+                if lowlink[func] == index[func]:
+                    scc = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        scc.append(member)
+                        if member == func:
+                            break
+                    sccs.append(scc)
+
+    return sccs
+
+def calculate_reachability(call_graph: Dict[str, Set[str]]) -> Tuple[List[str], Dict[str, int]]:
+    """
+    Calculate the functions reachable from every function (including itself).
 
-        for called in call_graph.get(current, set()):
-            if called not in reachable:
-                queue.append(called)
+    The call graph is condensed into strongly connected components, which are
+    processed callees first, so each component's reachable set is its members
+    plus the already computed sets of the components it calls. Every edge is
+    visited once instead of once per root.
 
-    return reachable
+    Reachable sets are bitsets: bit i is set if functions[i] is reachable.
+    Returns: (functions, dict mapping function_name -> bitset)
+    """
+    functions = list(call_graph)
+    function_ids = {func: i for i, func in enumerate(functions)}
+    reachable = {}
+    for scc in find_sccs(call_graph):
+        bits = 0
+        for func in scc:
+            bits |= 1 << function_ids[func]
+        for func in scc:
+            for called in call_graph.get(func, ()):
+                # Members of this component are not in reachable yet, their bits are set above
+                bits |= reachable.get(called, 0)
+        for func in scc:
+            reachable[func] = bits
+    return functions, reachable
+
+def iter_bits(bits: int) -> Iterator[int]:
+    """Yield the indices of the set bits, lowest first."""
+    digits = bin(bits)[:1:-1]  # binary digits, least significant first
+    i = digits.find('1')
+    while i >= 0:
+        yield i
+        i = digits.find('1', i + 1)
 
 def analyze_impact(binary: Path, git_dir: Path) -> None:
     """Main analysis function."""
@@ -146,20 +322,24 @@ def analyze_impact(binary: Path, git_dir: Path) -> None:
 
     # Get symbols from binary
     print("2. Extracting symbols from binary...", file=sys.stderr)
-    symbols_with_size = get_all_symbols(binary)
+    symbols_with_size = load_or_build(binary, 'symbols', lambda: get_all_symbols(binary))
     symbols = set(symbols_with_size.keys())
     print(f"   Found {len(symbols)} functions in binary", file=sys.stderr)
     print()
 
     # Build call graph
     print("3. Building call graph...", file=sys.stderr)
-    call_graph = build_call_graph(binary, symbols)
+    call_graph = load_or_build(binary, 'callgraph', lambda: build_call_graph(binary, symbols))
     print()
 
     # Calculate reachability from main (to identify what's already reachable)
-    print("4. Calculating reachability from main...", file=sys.stderr)
-    reachable_from_main = calculate_reachable_from('main', call_graph)
-    print(f"   {len(reachable_from_main)} functions reachable from main", file=sys.stderr)
+    print("4. Calculating reachability...", file=sys.stderr)
+    functions, reachability = calculate_reachability(call_graph)
+    reachable_from_main = reachability.get('main', 0)
+    main_count = bin(reachable_from_main).count('1') if 'main' in reachability else 1
+    print(f"   {main_count} functions reachable from main", file=sys.stderr)
+    function_ids = {func: i for i, func in enumerate(functions)}
+    sizes = [symbols_with_size.get(func, 0) for func in functions]
     print()
 
     # Analyze impact of each function pointer
@@ -168,13 +348,13 @@ def analyze_impact(binary: Path, git_dir: Path) -> None:
 
     for func_name in func_refs:
         # Only analyze if function exists in binary and is NOT reachable from main
-        if func_name in symbols and func_name not in reachable_from_main:
-            reachable = calculate_reachable_from(func_name, call_graph)
+        if func_name in symbols and not reachable_from_main >> function_ids[func_name] & 1:
+            reachable = reachability[func_name]
             # Calculate total size
-            total_size = sum(symbols_with_size.get(f, 0) for f in reachable)
+            total_size = sum(sizes[i] for i in iter_bits(reachable))
             impacts.append({
                 'function': func_name,
-                'reachable_count': len(reachable),
+                'reachable_count': bin(reachable).count('1'),
                 'total_bytes': total_size,
                 'references': func_refs[func_name]
             })
@@ -10,13 +10,22 @@ import sys
 import re
 import yaml
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Pattern, Tuple
+
+# Use the libyaml C bindings when available, they parse much faster
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+# Leading indentation of a source line
+INDENT_RE = re.compile(r'[ \t]*')
 
 def load_patches(yaml_path: Path) -> Dict:
     """Load patch configuration from YAML file."""
     try:
         with open(yaml_path) as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=YamlLoader)
     except FileNotFoundError:
         print(f"Error: Patch configuration not found: {yaml_path}", file=sys.stderr)
         sys.exit(1)
@@ -24,27 +33,30 @@ def load_patches(yaml_path: Path) -> Dict:
         print(f"Error: Invalid YAML in {yaml_path}: {e}", file=sys.stderr)
         sys.exit(1)
 
-def find_and_patch_line(lines: List[str], pattern: str, action: str) -> Tuple[bool, int]:
+def compile_pattern(pattern: str) -> Pattern[str]:
     r"""
-    Find pattern in lines and apply patch action.
+    Compile a patch pattern into a regex matching it at the start of a line.
 
     Automatically handles leading whitespace by prepending ^\s* to the pattern.
     This allows clean patterns in YAML without worrying about tabs vs spaces.
-
-    Returns: (success, line_number) where line_number is 1-indexed
     """
     # Build regex: start of line + any whitespace + user pattern
     # Escape special regex chars in user pattern
-    escaped_pattern = re.escape(pattern)
-    regex_pattern = r'^\s*' + escaped_pattern
+    return re.compile(r'^\s*' + re.escape(pattern))
 
+def find_and_patch_line(lines: List[str], regex: Pattern[str], action: str) -> Tuple[bool, int]:
+    """
+    Find the first line matching regex (see compile_pattern) and apply patch action.
+
+    Returns: (success, line_number) where line_number is 1-indexed
+    """
     for i, line in enumerate(lines):
-        if re.search(regex_pattern, line):
+        if regex.search(line):
             if action == 'comment':
-                # Comment out the line - preserve indentation
-                indent = len(line) - len(line.lstrip())
-                comment = '//' if not line.lstrip().startswith('//') else ''
-                lines[i] = ' ' * indent + comment + ' ' + line.lstrip()
+                # Comment out the line - keep the indentation exactly (tabs included)
+                indent_end = INDENT_RE.match(line).end()
+                if not line.startswith('//', indent_end):
+                    lines[i] = line[:indent_end] + '// ' + line[indent_end:]
             elif action == 'remove':
                 lines[i] = ''  # Remove line entirely
             else:
@@ -79,12 +91,13 @@ def apply_patches(submodule_dir: Path, patch_config: Dict) -> int:
         file_patches_applied = 0
 
         # Apply each patch for this file
-        for patch in file_config.get('patches', []):
+        compiled = [(compile_pattern(patch['pattern']), patch) for patch in file_config.get('patches', [])]
+        for regex, patch in compiled:
             pattern = patch['pattern']
             action = patch['action']
             reason = patch.get('reason', 'No reason specified')
 
-            success, line_num = find_and_patch_line(lines, pattern, action)
+            success, line_num = find_and_patch_line(lines, regex, action)
 
             if success:
                 print(f"  ✓ Line {line_num}: {action} - {reason}")
@@ -95,10 +108,12 @@ def apply_patches(submodule_dir: Path, patch_config: Dict) -> int:
                 print(f"     This may indicate a Git version change.", file=sys.stderr)
                 return -1
 
-        # Write patched file if changes were made
+        # Write patched file if changes were made (leaving unchanged files untouched
+        # keeps their mtime, so make does not rebuild them)
         if file_patches_applied > 0:
-            with open(file_path, 'w') as f:
-                f.writelines(lines)
+            if lines != original_lines:
+                with open(file_path, 'w') as f:
+                    f.writelines(lines)
             patches_applied += file_patches_applied
         else:
             print(f"  ℹ️  No patches applied to this file")